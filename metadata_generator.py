@@ -4,11 +4,30 @@ import argparse
 import hashlib
 import json
 import os
+import struct
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
 
+from mcap.exceptions import McapError
 from mcap.reader import make_reader
 
 DEFAULT_PATH = '/recorded_datasets/edinburgh'
+SCAN_THREADS = 16
+HASH_BUFFER_SIZE = 1024 * 1024
+DEFAULT_HASH_ALGORITHM = 'md5'
+HASH_ALGORITHMS = ('md5', 'sha256')
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+    'tartan_forklift',
+    'mcap_metadata_cache.json',
+)
+SCAN_FIELDS = ('size', 'hash', 'duration', 'topics', 'types')
 
 
 def read_mcap_file(mcap_file_path):
@@ -21,25 +40,30 @@ def read_mcap_file(mcap_file_path):
     Returns:
     dict: A dictionary containing information.
     """
-    topic_message_counts = {}
-    topic_message_types = {}
-    start_time = None
-    end_time = None
-
     with open(mcap_file_path, 'rb') as f:
-        reader = make_reader(f)
-        for schema, channel, message in reader.iter_messages():
-            if start_time is None:
-                start_time = message.log_time
-            end_time = message.log_time
-
-            topic = channel.topic
-            if topic not in topic_message_counts:
-                topic_message_counts[topic] = 0
-                topic_message_types[topic] = (
-                    schema.name
-                )  # Store the message type
-            topic_message_counts[topic] += 1
+        return read_mcap_stream(f)
+
+
+def read_mcap_stream(stream):
+    """
+    Extract metadata from an open MCAP file.
+
+    Parameters:
+    stream (BinaryIO): A seekable binary stream positioned at the start of
+    the MCAP file.
+
+    Returns:
+    dict: A dictionary containing information.
+    """
+    reader = make_reader(stream)
+    summary = reader.get_summary()
+    if has_complete_statistics(summary):
+        counts = read_mcap_summary(summary)
+    else:
+        # Unindexed file or incomplete statistics: read every message
+        stream.seek(0)
+        counts = read_mcap_messages(make_reader(stream))
+    topic_message_counts, topic_message_types, start_time, end_time = counts
 
     duration = end_time - start_time
     duration_seconds = duration / 1e9  # Convert nanoseconds to seconds
@@ -53,6 +77,101 @@ def read_mcap_file(mcap_file_path):
     return result
 
 
+def has_complete_statistics(summary):
+    """
+    Check whether the summary statistics account for every message.
+
+    Some writers leave the per-channel counts empty while still writing the
+    total, in which case the counts cannot be trusted.
+
+    Parameters:
+    summary (mcap.reader.Summary): The MCAP summary, or None.
+
+    Returns:
+    bool: True if the per-channel counts add up to the message count.
+    """
+    if summary is None or summary.statistics is None:
+        return False
+    statistics = summary.statistics
+    return (
+        sum(statistics.channel_message_counts.values())
+        == statistics.message_count
+    )
+
+
+def read_mcap_summary(summary):
+    """
+    Get message counts and time range from an MCAP summary section.
+
+    The summary statistics are written by the recorder, so this avoids
+    decoding any message regardless of the file size.
+
+    Parameters:
+    summary (mcap.reader.Summary): The MCAP summary, with statistics.
+
+    Returns:
+    tuple: Topic message counts, topic message types, start and end time.
+    """
+    topic_message_counts = {}
+    topic_message_types = {}
+    statistics = summary.statistics
+
+    for channel_id, count in statistics.channel_message_counts.items():
+        if count == 0:
+            continue
+        channel = summary.channels[channel_id]
+        topic = channel.topic
+        schema = summary.schemas.get(channel.schema_id)
+        topic_message_counts[topic] = (
+            topic_message_counts.get(topic, 0) + count
+        )
+        topic_message_types.setdefault(
+            topic, schema.name if schema is not None else ''
+        )
+
+    return (
+        topic_message_counts,
+        topic_message_types,
+        statistics.message_start_time,
+        statistics.message_end_time,
+    )
+
+
+def read_mcap_messages(reader):
+    """
+    Get message counts and time range by iterating over every message.
+
+    Parameters:
+    reader (mcap.reader.McapReader): The MCAP reader.
+
+    Returns:
+    tuple: Topic message counts, topic message types, start and end time.
+    """
+    topic_message_counts = defaultdict(int)
+    topic_message_types = {}
+    start_time = None
+    end_time = None
+
+    for schema, channel, message in reader.iter_messages():
+        if start_time is None:
+            start_time = message.log_time
+        end_time = message.log_time
+
+        topic = channel.topic
+        topic_message_counts[topic] += 1
+        # Store the message type, empty for schemaless channels
+        topic_message_types.setdefault(
+            topic, schema.name if schema is not None else ''
+        )
+
+    return (
+        dict(topic_message_counts),
+        topic_message_types,
+        start_time,
+        end_time,
+    )
+
+
 def get_file_size(file_path):
     """
     Get the size of a file.
@@ -66,36 +185,186 @@ def get_file_size(file_path):
     return os.path.getsize(file_path)
 
 
-def get_file_hash(file_path):
+def get_file_hash(file_path, algorithm=DEFAULT_HASH_ALGORITHM):
     """
     Get the hash of a file.
 
+    Hashes other than MD5 are prefixed with the algorithm name
+    (e.g. 'sha256:...') so the value is self-describing, while MD5 hashes
+    keep the historical bare format.
+
     Parameters:
     file_path (str): The path to the file.
+    algorithm (str): The hashlib algorithm name, one of HASH_ALGORITHMS.
+
+    Returns:
+    str: The hash of the file.
+    """
+    with open(file_path, 'rb') as f:
+        return hash_stream(f, algorithm)
+
+
+def hash_stream(stream, algorithm=DEFAULT_HASH_ALGORITHM):
+    """
+    Hash an open binary stream from its current position to the end.
+
+    Parameters:
+    stream (BinaryIO): The binary stream to hash.
+    algorithm (str): The hashlib algorithm name, one of HASH_ALGORITHMS.
+
+    Returns:
+    str: The hash of the stream, formatted as in get_file_hash.
+    """
+    if hasattr(hashlib, 'file_digest'):
+        # Python >= 3.11 streams the file through OpenSSL in C
+        digest = hashlib.file_digest(stream, algorithm).hexdigest()
+    else:
+        hash_func = hashlib.new(algorithm)
+        buffer = bytearray(HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while size := stream.readinto(buffer):
+            hash_func.update(view[:size])
+        digest = hash_func.hexdigest()
+
+    if algorithm == DEFAULT_HASH_ALGORITHM:
+        return digest
+    return f'{algorithm}:{digest}'
+
+
+def scan_file(file_path, hash_algorithm=DEFAULT_HASH_ALGORITHM):
+    """
+    Stat, hash and read an MCAP file through a single file handle.
+
+    Parameters:
+    file_path (str): The path to the MCAP file.
+    hash_algorithm (str): The algorithm used for the file hash.
 
     Returns:
-    str: The MD5 hash of the file.
+    tuple: The os.stat_result, the file hash and the MCAP information.
     """
-    hash_func = hashlib.md5()
     with open(file_path, 'rb') as f:
-        while chunk := f.read(8192):
-            hash_func.update(chunk)
-    return hash_func.hexdigest()
+        stat = os.fstat(f.fileno())
+        file_hash = hash_stream(f, hash_algorithm)
+        f.seek(0)
+        mcap_info = read_mcap_stream(f)
+    return stat, file_hash, mcap_info
 
 
-def generate_metadata(file_path, root_dir):
+def load_scan_cache(cache_path):
+    """
+    Load the scan results cached by previous runs.
+
+    Parameters:
+    cache_path (str): The path to the cache file.
+
+    Returns:
+    dict: Cache entries keyed by absolute MCAP file path, empty if the
+    cache is missing or unreadable.
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cache = json.loads(cache_file.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    # Malformed entries are treated as cache misses
+    return {
+        file_path: entry
+        for file_path, entry in cache.items()
+        if isinstance(entry, dict)
+        and isinstance(entry.get('key'), list)
+        and isinstance(entry.get('scan'), dict)
+        and all(field in entry['scan'] for field in SCAN_FIELDS)
+    }
+
+
+def save_scan_cache(cache_path, cache):
+    """
+    Save scan results for reuse by later runs.
+
+    The cache file is replaced atomically. Failures are reported but not
+    raised, since the cache is only an optimisation.
+
+    Parameters:
+    cache_path (str): The path to the cache file.
+    cache (dict): Cache entries keyed by absolute MCAP file path.
+    """
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(temp_path, 'w') as cache_file:
+            json.dump(cache, cache_file, separators=(',', ':'))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f'Warning: could not write scan cache {cache_path}: {e}')
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def prune_scan_cache(cache, directory, scanned):
+    """
+    Combine the cache with the scans of a run, dropping stale entries.
+
+    Parameters:
+    cache (dict): Cache entries loaded from the cache file.
+    directory (str): The directory that was scanned.
+    scanned (dict): Cache entries of the files scanned in this run.
+
+    Returns:
+    dict: Entries of this run, plus those of other directories whose
+    files still exist.
+    """
+    root = os.path.join(os.path.abspath(directory), '')
+    pruned = {
+        file_path: entry
+        for file_path, entry in cache.items()
+        if not file_path.startswith(root) and os.path.isfile(file_path)
+    }
+    pruned.update(scanned)
+    return pruned
+
+
+def generate_metadata(
+    file_path,
+    root_dir,
+    hash_algorithm=DEFAULT_HASH_ALGORITHM,
+    cache_entry=None,
+):
     """
     Generate metadata for an MCAP file.
 
     Parameters:
     file_path (str): The path to the MCAP file.
     root_dir (str): The root directory for relative path calculation.
+    hash_algorithm (str): The algorithm used for 'resource:hash'.
+    cache_entry (dict): The cached scan of the file from a previous run,
+    reused when the file size and mtime are unchanged.
 
     Returns:
-    tuple: A tuple containing the relative path and the metadata dictionary.
+    tuple: The relative path, the metadata dictionary and the cache entry
+    for the file.
+
+    Raises:
+    RuntimeError: If the file cannot be read or is not a valid MCAP file,
+    naming the file and cause.
     """
     relative_path = os.path.relpath(file_path, root_dir)
-    mcap_info = read_mcap_file(file_path)
+    try:
+        stat = os.stat(file_path)
+        cache_key = [stat.st_size, stat.st_mtime_ns, hash_algorithm]
+        if cache_entry is None or cache_entry.get('key') != cache_key:
+            stat, file_hash, mcap_info = scan_file(file_path, hash_algorithm)
+            cache_entry = {
+                'key': [stat.st_size, stat.st_mtime_ns, hash_algorithm],
+                'scan': {'size': stat.st_size, 'hash': file_hash, **mcap_info},
+            }
+    except (OSError, ValueError, struct.error, McapError) as e:
+        # Runs in a worker process: mcap exceptions cannot be pickled back
+        # to the parent, so report the file and cause in one that can
+        raise RuntimeError(f'{file_path}: {type(e).__name__}: {e}') from e
+    scan = cache_entry['scan']
+
     metadata = {
         'name': os.path.basename(file_path),
         'resource:identifier': os.path.splitext(os.path.basename(file_path))[
@@ -104,25 +373,92 @@ def generate_metadata(file_path, root_dir):
         'resource:description': 'Rosbag MCAP log file',
         'resource:format': 'MCAP',
         'resource:licence': 'cc-by-4.0',
-        'resource:size': get_file_size(file_path),
-        'resource:hash': get_file_hash(file_path),
+        'resource:size': scan['size'],
+        'resource:hash': scan['hash'],
         'resource:issued': datetime.now().strftime('%Y-%m-%d'),
-        'resource:modified': datetime.fromtimestamp(
-            os.path.getmtime(file_path)
-        ).strftime('%Y-%m-%d'),
-        'duration': mcap_info['duration'],
-        'topics': mcap_info['topics'],
-        'types': mcap_info['types'],  # Include the message types
+        'resource:modified': datetime.fromtimestamp(stat.st_mtime).strftime(
+            '%Y-%m-%d'
+        ),
+        'duration': scan['duration'],
+        'topics': scan['topics'],
+        'types': scan['types'],  # Include the message types
     }
-    return relative_path, metadata
+    return relative_path, metadata, cache_entry
+
+
+def scan_directory(directory):
+    """
+    List a single directory level.
 
+    Parameters:
+    directory (str): The directory to scan.
 
-def create_resources_json(directory):
+    Returns:
+    tuple: A tuple with the MCAP file paths and the subdirectory paths.
+    Directories that cannot be listed are skipped, as os.walk does.
+    """
+    mcap_files = []
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.endswith('.mcap'):
+                    mcap_files.append(entry.path)
+    except OSError:
+        # Unreadable or vanished directory
+        return [], []
+    return mcap_files, subdirectories
+
+
+def find_mcap_files(directory, max_threads=SCAN_THREADS):
+    """
+    Recursively find all MCAP files in a directory.
+
+    Directories are listed concurrently and each subdirectory is queued as
+    soon as it is found, which hides the latency of network filesystems
+    where every readdir is a round trip.
+
+    Parameters:
+    directory (str): The directory to search for MCAP files.
+    max_threads (int): Number of threads listing directories.
+
+    Returns:
+    list: Sorted list of MCAP file paths.
+    """
+    mcap_files = []
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        pending = {executor.submit(scan_directory, directory)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                mcap_files.extend(files)
+                pending.update(
+                    executor.submit(scan_directory, subdirectory)
+                    for subdirectory in subdirectories
+                )
+    return sorted(mcap_files)
+
+
+def create_resources_json(
+    directory,
+    max_workers=None,
+    hash_algorithm=DEFAULT_HASH_ALGORITHM,
+    cache_path=DEFAULT_CACHE_PATH,
+):
     """
     Create a JSON file containing metadata for all MCAP files in a directory.
 
     Parameters:
     directory (str): The directory to search for MCAP files.
+    max_workers (int): Number of worker processes. Defaults to the number
+    of CPUs.
+    hash_algorithm (str): The algorithm used for 'resource:hash'.
+    cache_path (str): File caching the scans of unchanged MCAP files
+    between runs, kept outside the dataset. None disables the cache.
+    Entries of deleted files are dropped when the cache is saved.
     """
     resources = {
         'name': 'dataset',
@@ -132,17 +468,88 @@ def create_resources_json(directory):
         'resource:format': 'MCAP',
     }
 
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.mcap'):
-                file_path = os.path.join(root, file)
-                relative_path, metadata = generate_metadata(
-                    file_path, directory
+    mcap_files = find_mcap_files(directory)
+    cache = load_scan_cache(cache_path) if cache_path else {}
+    cache_keys = [os.path.abspath(file_path) for file_path in mcap_files]
+    futures = []
+
+    try:
+        # Each file is scanned and hashed independently, so spread the
+        # work across processes. Results are read in the sorted file order
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    generate_metadata,
+                    file_path,
+                    directory,
+                    hash_algorithm,
+                    cache.get(cache_key),
                 )
+                for file_path, cache_key in zip(mcap_files, cache_keys)
+            ]
+            for future in futures:
+                relative_path, metadata, _ = future.result()
                 resources[relative_path] = metadata
+        write_resources_json(
+            os.path.join(directory, 'resources.json'), resources
+        )
+    finally:
+        # Keep the completed scans even if another file failed. The
+        # executor has waited for every submitted scan by now
+        if cache_path:
+            scanned = {
+                cache_key: future.result()[2]
+                for cache_key, future in zip(cache_keys, futures)
+                if not future.cancelled() and future.exception() is None
+            }
+            save_scan_cache(
+                cache_path, prune_scan_cache(cache, directory, scanned)
+            )
+
+
+def write_resources_json(json_path, resources):
+    """
+    Write resources.json, replacing any previous file atomically.
+
+    The JSON is written to a temporary path and moved into place once
+    complete, so an interrupted run never leaves a truncated file.
+
+    Parameters:
+    json_path (str): The path of the JSON file to write.
+    resources (dict): The dataset and file metadata.
+    """
+    temp_path = f'{json_path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w') as json_file:
+            json.dump(resources, json_file, indent=4)
+        os.replace(temp_path, json_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
 
-    with open(os.path.join(directory, 'resources.json'), 'w') as json_file:
-        json.dump(resources, json_file, indent=4)
+def positive_int(value):
+    """
+    Parse a command line argument as an integer of at least 1.
+
+    Parameters:
+    value (str): The argument value.
+
+    Returns:
+    int: The parsed value.
+
+    Raises:
+    argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'must be a positive integer, got {value!r}'
+        )
+    return number
 
 
 def main():
@@ -156,9 +563,39 @@ def main():
         default=DEFAULT_PATH,
         help='Path to the directory containing MCAP files',
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=positive_int,
+        default=None,
+        help='Number of parallel worker processes (default: CPU count)',
+    )
+    parser.add_argument(
+        '--hash',
+        choices=HASH_ALGORITHMS,
+        default=DEFAULT_HASH_ALGORITHM,
+        help='Hash algorithm for resource:hash. sha256 uses the CPU SHA '
+        'extensions when available (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--cache-file',
+        default=DEFAULT_CACHE_PATH,
+        help='File caching the scans of unchanged MCAP files between runs '
+        '(default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rescan every file and do not read or write the cache file',
+    )
 
     args = parser.parse_args()
-    create_resources_json(args.p)
+    create_resources_json(
+        args.p,
+        args.jobs,
+        args.hash,
+        cache_path=None if args.no_cache else args.cache_file,
+    )
 
 
 if __name__ == '__main__':
@@ -10,27 +10,35 @@ rosbags and the topics to merge
 import argparse
 import os
 import re
-import shutil
 import subprocess
+import tempfile
 import time
-from pathlib import Path
 
 import yaml
 
+# Prefer the libyaml-backed loader and dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+# Numeric index at the end of split rosbag names, e.g. 'bag_12.mcap'
+NUMERIC_SUFFIX_PATTERN = re.compile(r'_(\d+)\.mcap$')
+
 
 def sort_by_numeric_suffix(files):
     """
     Sorts a list of files by numeric suffix extracted from their filenames.
 
     Args:
-        files (list): List of file paths.
+        files (iterable): File paths.
 
     Returns:
         list: Sorted list of file paths based on numeric suffix.
     """
 
     def extract_number(file):
-        match = re.search(r'_(\d+)\.mcap$', file)
+        match = NUMERIC_SUFFIX_PATTERN.search(file)
         return (
             int(match.group(1)) if match else float('inf')
         )  # Non-matching files go to the end
@@ -52,7 +60,7 @@ def create_temp_yaml(input_rosbag_dir, yaml_file):
                             empty string on error.
     """
     with open(yaml_file) as file:
-        data = yaml.safe_load(file)
+        data = yaml.load(file, Loader=SafeLoader)
 
     # Modify the 'uri' parameter
     if 'output_bags' in data:
@@ -60,20 +68,25 @@ def create_temp_yaml(input_rosbag_dir, yaml_file):
             if 'uri' in entry:
                 entry['uri'] = os.path.join(input_rosbag_dir, entry['uri'])
 
-    # Create a temporary file in the current directory
-    tmp_yaml_path = os.path.join(
-        input_rosbag_dir, 'ros2_convert_temp_params.yaml'
+    # Create a uniquely named temporary file so concurrent merges do not
+    # overwrite each other's parameters
+    fd, tmp_yaml_path = tempfile.mkstemp(
+        prefix='ros2_convert_params_', suffix='.yaml'
     )
 
     try:
-        with open(tmp_yaml_path, 'w') as temp_file:
-            yaml.dump(data, temp_file, default_flow_style=False)
+        with os.fdopen(fd, 'w') as temp_file:
+            yaml.dump(
+                data, temp_file, Dumper=SafeDumper, default_flow_style=False
+            )
 
-    except FileNotFoundError as e:
-        print(f'Error: File not found - {e}')
+    except OSError as e:
+        print(f'Error: Failed to write temp YAML - {e}')
+        os.remove(tmp_yaml_path)
         return [False, '']
     except yaml.YAMLError as e:
         print(f'Error: Failed to parse YAML - {e}')
+        os.remove(tmp_yaml_path)
         return [False, '']
 
     return [True, tmp_yaml_path]
@@ -90,7 +103,7 @@ def merge_rosbags(input_dir: str, yaml_file_path: str, range_str: str = None):
     # Load the YAML file
     try:
         with open(yaml_file_path) as yaml_file:
-            yaml_content = yaml.safe_load(yaml_file)
+            yaml_content = yaml.load(yaml_file, Loader=SafeLoader)
     except (OSError, yaml.YAMLError) as e:
         raise ValueError(
             f'Failed to load YAML file: {yaml_file_path}. Error: {e}'
@@ -105,8 +118,16 @@ def merge_rosbags(input_dir: str, yaml_file_path: str, range_str: str = None):
         )
 
     # Find all .mcap files in the given directory in a non-recursive way
-    mcap_files = [str(file) for file in Path(input_dir).glob('*.mcap')]
-    mcap_files = sort_by_numeric_suffix(mcap_files)
+    try:
+        with os.scandir(input_dir) as entries:
+            mcap_files = sort_by_numeric_suffix(
+                entry.path
+                for entry in entries
+                if entry.name.endswith('.mcap') and entry.is_file()
+            )
+    except OSError as e:
+        print(f'Failed to read directory: {input_dir}. Error: {e}')
+        return
 
     if not mcap_files:
         print(f'No .mcap files found in directory: {input_dir}')
@@ -147,11 +168,11 @@ def merge_rosbags(input_dir: str, yaml_file_path: str, range_str: str = None):
 
     # Execute the command
     try:
-        start_time = time.time()
+        start_time = time.monotonic()
 
         subprocess.run(command, check=True)
 
-        end_time = time.time()
+        end_time = time.monotonic()
 
         elapsed_time = end_time - start_time
         print(
@@ -181,7 +202,7 @@ def merge_rosbags(input_dir: str, yaml_file_path: str, range_str: str = None):
             input_dir, output_bag_name, output_bag_name + '_0.mcap'
         )
 
-        shutil.move(output_bag_file_path, new_bag_file_path)
+        os.replace(output_bag_file_path, new_bag_file_path)
 
         print(f'Saved as: {new_bag_file_path}')
     except subprocess.CalledProcessError as e:
@@ -1,9 +1,12 @@
 """This script automates the upload of rosbags from vehicle to cloud host."""
 
 import argparse
+import atexit
 import logging
+import logging.handlers
 import os
 import subprocess
+import tempfile
 import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
@@ -12,6 +15,29 @@ import colorlog
 
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Socket of the SSH master connection reused by every SSH command. It lives
+# in the private ~/.ssh directory so other local users cannot pre-create or
+# hijack it; ssh expands '~' and the '%C' connection hash itself
+SSH_CONTROL_PATH = f'~/.ssh/cm-%C-{os.getpid()}'
+# Idle time after which the master exits even if atexit never runs
+SSH_CONTROL_PERSIST = '10m'
+# Ciphers and QoS suited to bulk transfers. AES-GCM is preferred as it is
+# hardware accelerated; the fallbacks keep the connection working when the
+# vehicle's sshd does not offer it
+SSH_CIPHERS = 'aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,aes128-ctr'
+SSH_TUNING_OPTIONS = f'-c {SSH_CIPHERS} -o Compression=no -o IPQoS=throughput'
+# Remote shell for small rsync copies, multiplexed over the same connection
+RSYNC_SSH = f'ssh {SSH_TUNING_OPTIONS} -o ControlPath={SSH_CONTROL_PATH}'
+# Remote shell for rosbag transfers. Each gets its own connection so that
+# parallel transfers do not share one TCP stream and one encrypting process
+RSYNC_BULK_SSH = f'ssh {SSH_TUNING_OPTIONS} -o ControlPath=none'
+
 
 def setup_logging(debug_mode):
     """Configure logging with color support."""
@@ -47,21 +73,74 @@ def setup_logging(debug_mode):
     )
     file_handler.setFormatter(file_formatter)
 
+    # Buffer file records and write them in batches, flushing straight away
+    # on warnings. Remaining records are flushed by logging at exit
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.WARNING, target=file_handler
+    )
+    buffered_file_handler.setLevel(
+        logging.DEBUG if debug_mode else logging.INFO
+    )
+
     # Add the handlers to the logger
     logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(buffered_file_handler)
 
     return logger
 
 
+def ssh_cmd(remote_user, remote_ip):
+    """Return the SSH command prefix, multiplexed over the master socket."""
+    return (
+        f'ssh {SSH_TUNING_OPTIONS} -o ControlPath={SSH_CONTROL_PATH} '
+        f'{remote_user}@{remote_ip}'
+    )
+
+
+def start_ssh_master(logger, remote_user, remote_ip):
+    """Open a persistent SSH connection shared by all SSH commands."""
+    master_cmd = [
+        'ssh',
+        '-M',
+        '-N',
+        '-f',
+        *SSH_TUNING_OPTIONS.split(),
+        '-o',
+        f'ControlPath={SSH_CONTROL_PATH}',
+        '-o',
+        f'ControlPersist={SSH_CONTROL_PERSIST}',
+        f'{remote_user}@{remote_ip}',
+    ]
+    try:
+        subprocess.run(master_cmd, check=True)
+        logger.debug('Started SSH master connection to %s', remote_ip)
+    except subprocess.CalledProcessError as e:
+        # Commands still work without the master, just slower
+        logger.warning('Failed to start SSH master connection: %s', e)
+
+
+def stop_ssh_master(logger, remote_user, remote_ip):
+    """Close the persistent SSH connection."""
+    exit_cmd = [
+        'ssh',
+        '-o',
+        f'ControlPath={SSH_CONTROL_PATH}',
+        '-O',
+        'exit',
+        f'{remote_user}@{remote_ip}',
+    ]
+    subprocess.run(exit_cmd, capture_output=True)
+    logger.debug('Stopped SSH master connection to %s', remote_ip)
+
+
 def run_ssh_command(logger, remote_user, remote_ip, command):
     """Run a command on the remote machine using SSH."""
-    ssh_command = f"ssh {remote_user}@{remote_ip} '{command}'"
+    ssh_command = f"{ssh_cmd(remote_user, remote_ip)} '{command}'"
     try:
         subprocess.run(ssh_command, shell=True, check=True)
-        logger.debug(f'Ran SSH command: {command}')
+        logger.debug('Ran SSH command: %s', command)
     except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to run SSH command: {command}: {e}')
+        logger.error('Failed to run SSH command: %s: %s', command, e)
         raise
 
 
@@ -72,7 +151,7 @@ def create_remote_temp_directory(
     command = f'mkdir -p {remote_directory}/temp'
     run_ssh_command(logger, remote_user, remote_ip, command)
     logger.debug(
-        f'Created remote temporary directory: {remote_directory}/temp'
+        'Created remote temporary directory: %s/temp', remote_directory
     )
 
 
@@ -83,7 +162,7 @@ def delete_remote_temp_directory(
     command = f'rm -rf {remote_directory}/temp'
     run_ssh_command(logger, remote_user, remote_ip, command)
     logger.debug(
-        f'Deleted remote temporary directory: {remote_directory}/temp'
+        'Deleted remote temporary directory: %s/temp', remote_directory
     )
 
 
@@ -93,12 +172,12 @@ def delete_remote_directory_contents(
     """Delete the contents of a directory on the remote machine."""
     command = f'rm -rf {remote_directory}/*'
     run_ssh_command(logger, remote_user, remote_ip, command)
-    logger.debug(f'Deleted contents of remote directory: {remote_directory}')
+    logger.debug('Deleted contents of remote directory: %s', remote_directory)
 
 
 def get_remote_home_directory(logger, remote_user, remote_ip):
     """Get the home directory of the remote user."""
-    home_dir_cmd = f'ssh {remote_user}@{remote_ip} "eval echo ~$USER"'
+    home_dir_cmd = f'{ssh_cmd(remote_user, remote_ip)} "eval echo ~$USER"'
     try:
         result = subprocess.run(
             home_dir_cmd,
@@ -109,12 +188,13 @@ def get_remote_home_directory(logger, remote_user, remote_ip):
         )
         remote_home_directory = result.stdout.strip()
         logger.info(
-            f'Remote home directory for {remote_user} '
-            f'is {remote_home_directory}'
+            'Remote home directory for %s is %s',
+            remote_user,
+            remote_home_directory,
         )
         return remote_home_directory
     except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to get remote home directory: {e}')
+        logger.error('Failed to get remote home directory: %s', e)
         raise
 
 
@@ -123,31 +203,33 @@ def compress_and_transfer_rosbag(
     remote_user,
     remote_ip,
     rosbag_path,
+    rosbag_size,
+    local_rosbag_path,
     remote_directory,
-    cloud_upload_directory,
     mcap_path,
     max_upload_attempts,
-    base_remote_directory,
     current_rosbag_number,
     total_rosbags,
     global_rosbag_counter,
 ):
     """Compress rosbag on remote machine and transfer it to cloud host."""
     remote_temp_directory = f'{remote_directory}/temp'
-    relative_bag_path = os.path.relpath(
-        rosbag_path, start=base_remote_directory
-    )
     # Check available disk space before compression
 
     if not check_disk_space(
-        logger, remote_user, remote_ip, remote_temp_directory, rosbag_path
+        logger,
+        remote_user,
+        remote_ip,
+        remote_temp_directory,
+        rosbag_path,
+        rosbag_size,
     ):
-        logger.error(f'Insufficient disk space for compressing {rosbag_path}')
+        logger.error('Insufficient disk space for compressing %s', rosbag_path)
         return False
 
     logger.info(
-        f'Enough space found on the remote machine. Start '
-        f'compressing: \n{rosbag_path}'
+        'Enough space found on the remote machine. Start compressing: \n%s',
+        rosbag_path,
     )
 
     remote_compressed_path = os.path.join(
@@ -157,19 +239,21 @@ def compress_and_transfer_rosbag(
         f'{mcap_path} compress {rosbag_path} -o {remote_compressed_path}'
     )
     try:
-        start_time = time.time()
+        start_time = time.monotonic()
         run_ssh_command(logger, remote_user, remote_ip, compress_cmd)
-        duration = time.time() - start_time
+        duration = time.monotonic() - start_time
 
-        logger.info(f'Rosbag compressed in  {duration:.2f} seconds')
+        logger.info('Rosbag compressed in  %.2f seconds', duration)
 
         logger.debug(
-            f'Compressed version temporarily stored in '
-            f'{remote_compressed_path}'
+            'Compressed version temporarily stored in %s',
+            remote_compressed_path,
         )
     except subprocess.CalledProcessError as e:
         logger.error(
-            f'Failed to compress rosbag {rosbag_path} on remote machine: {e}'
+            'Failed to compress rosbag %s on remote machine: %s',
+            rosbag_path,
+            e,
         )
         return False
 
@@ -180,8 +264,10 @@ def compress_and_transfer_rosbag(
         '--checksum',
         '--progress',
         '--stats',
+        '-e',
+        RSYNC_BULK_SSH,
         f'{remote_user}@{remote_ip}:{remote_compressed_path}',
-        os.path.join(cloud_upload_directory, relative_bag_path),
+        local_rosbag_path,
     ]
 
     success = False
@@ -189,34 +275,40 @@ def compress_and_transfer_rosbag(
     while attempts < max_upload_attempts:
         try:
             logger.info(
-                f'Uploading rosbag {global_rosbag_counter}/{total_rosbags} ...'
+                'Uploading rosbag %s/%s ...',
+                global_rosbag_counter,
+                total_rosbags,
             )
-            start_time = time.time()
+            start_time = time.monotonic()
             subprocess.run(rsync_cmd, check=True)
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
 
-            logger.info(f'Rosbag uploaded in {duration:.2f} seconds')
+            logger.info('Rosbag uploaded in %.2f seconds', duration)
 
             logger.debug(
-                f'Compressed rosbag {remote_compressed_path} '
-                f'uploaded to {cloud_upload_directory}.'
+                'Compressed rosbag %s uploaded to %s.',
+                remote_compressed_path,
+                local_rosbag_path,
             )
             success = True
             break
         except subprocess.CalledProcessError as e:
             attempts += 1
             logger.warning(
-                f'Failed to transfer compressed rosbag'
-                f'{remote_compressed_path} '
-                f'from remote machine: {e}. '
-                f'Attempt {attempts} of {max_upload_attempts}. Retrying...'
+                'Failed to transfer compressed rosbag%s '
+                'from remote machine: %s. Attempt %s of %s. Retrying...',
+                remote_compressed_path,
+                e,
+                attempts,
+                max_upload_attempts,
             )
 
     if not success:
         logger.error(
-            f'All {max_upload_attempts} attempts to'
-            f' transfer compressed rosbag '
-            f'{remote_compressed_path} from remote machine have failed.'
+            'All %s attempts to transfer compressed rosbag '
+            '%s from remote machine have failed.',
+            max_upload_attempts,
+            remote_compressed_path,
         )
         return False
 
@@ -225,85 +317,72 @@ def compress_and_transfer_rosbag(
     try:
         run_ssh_command(logger, remote_user, remote_ip, remove_remote_file_cmd)
         logger.debug(
-            f'Removed compressed rosbag {remote_compressed_path}'
-            f' from the remote machine.'
+            'Removed compressed rosbag %s from the remote machine.',
+            remote_compressed_path,
         )
     except subprocess.CalledProcessError as e:
         logger.error(
-            f'Failed to remove compressed rosbag'
-            f'{remote_compressed_path} from remote machine: {e}'
+            'Failed to remove compressed rosbag%s from remote machine: %s',
+            remote_compressed_path,
+            e,
         )
         return False
 
     return True
 
 
-def get_remote_rosbags_list(logger, remote_user, remote_ip, remote_directory):
-    """Get a list of all rosbags on the remote machine."""
-    list_cmd = f"find {remote_directory} -name '*.mcap'"
-    try:
-        result = subprocess.run(
-            f'ssh {remote_user}@{remote_ip} ' f"'{list_cmd}'",
-            shell=True,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        rosbag_list = result.stdout.splitlines()
-        logger.info(f'Found {len(rosbag_list)} rosbags in the subdirectory.')
-        return rosbag_list
-    except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to list rosbags on remote machine: {e}')
-        raise
-
-
-def list_remote_directories(
-    logger, remote_user, remote_ip, base_remote_directory
-):
-    """List directories on the remote machine containing .mcap files."""
+def list_remote_rosbags(logger, remote_user, remote_ip, base_remote_directory):
+    """List all rosbags and their sizes grouped by remote directory."""
     list_cmd = (
-        f'ssh {remote_user}@{remote_ip} '
+        f'{ssh_cmd(remote_user, remote_ip)} '
         f'"find {base_remote_directory} -type f -name \\"*.mcap\\" '
-        f'-printf \'%h\\n\' | sort -u"'
+        f'-printf \'%s\\t%h\\t%p\\n\'"'
     )
-    try:
-        result = subprocess.run(
+    rosbags_dict = {}
+    # stderr goes to a file so a burst of errors cannot block the pipe
+    with tempfile.TemporaryFile(mode='w+') as stderr_file:
+        # Parse the listing as it streams in rather than buffering it all
+        process = subprocess.Popen(
             list_cmd,
             shell=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
             text=True,
-            check=True,
-        )
-        subdirectories = result.stdout.splitlines()
-        logger.info(
-            f'Listed directories containing .mcap '
-            f'files in {base_remote_directory}'
         )
-        return subdirectories
-    except subprocess.CalledProcessError as e:
-        logger.error(
-            f'Failed to list directories in {base_remote_directory}: {e}'
+        with process:
+            for line in process.stdout:
+                try:
+                    size, directory, rosbag = line.rstrip('\n').split('\t', 2)
+                    size = int(size)
+                except ValueError:
+                    logger.warning('Skipping malformed listing line: %r', line)
+                    continue
+                if directory not in rosbags_dict:
+                    rosbags_dict[directory] = []
+                    logger.debug('Found rosbags directory: %s', directory)
+                rosbags_dict[directory].append((rosbag, size))
+        stderr_file.seek(0)
+        errors = stderr_file.read().strip()
+
+    if process.returncode != 0:
+        # find exits non-zero if any subdirectory is unreadable; keep what it
+        # did list, as the old '| sort -u' pipeline did
+        log = logger.warning if rosbags_dict else logger.error
+        log(
+            'Listing rosbags in %s exited with status %s, some directories '
+            'may be missing: %s',
+            base_remote_directory,
+            process.returncode,
+            errors or 'no error output',
         )
-        return []
+    elif errors:
+        logger.warning('Listing rosbags reported: %s', errors)
 
-
-def get_remote_file_size(logger, remote_user, remote_ip, file_path):
-    """Get the size of a remote file."""
-    size_cmd = f'stat -c%s {file_path}'
-    try:
-        result = subprocess.run(
-            f'ssh {remote_user}@{remote_ip} ' f"'{size_cmd}'",
-            shell=True,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        file_size = int(result.stdout.strip())
-        logger.info(f'Size of file {file_path} is {file_size} bytes.')
-        return file_size  # Return size in bytes for further calculations
-    except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to get size of remote file {file_path}: {e}')
-        raise
+    logger.info(
+        'Listed directories containing .mcap files in %s',
+        base_remote_directory,
+    )
+    return dict(sorted(rosbags_dict.items()))
 
 
 def get_estimated_compression_time(file_sizes):
@@ -331,12 +410,12 @@ def get_estimated_upload_time(total_size_bytes, bandwidth_mbps, file_sizes):
 
 def measure_bandwidth(logger, remote_ip, remote_user):
     """Measure bandwidth between cloud host and remote machine."""
-    logger.info(f'Starting bandwidth measurement for {remote_ip}...')
+    logger.info('Starting bandwidth measurement for %s...', remote_ip)
     try:
         # Start iperf3 server on the remote machine
-        server_cmd = f'ssh {remote_user}@{remote_ip} ' f"'iperf3 -s -D'"
+        server_cmd = f'{ssh_cmd(remote_user, remote_ip)} ' f"'iperf3 -s -D'"
         subprocess.run(server_cmd, shell=True, check=True)
-        logger.debug(f'Started iperf3 server on {remote_ip}')
+        logger.debug('Started iperf3 server on %s', remote_ip)
 
         # Run iperf3 client on the cloud host
         result = subprocess.run(
@@ -348,28 +427,37 @@ def measure_bandwidth(logger, remote_ip, remote_user):
         for line in result.stdout.split('\n'):
             if 'receiver' in line:
                 bandwidth_mbps = float(line.split()[-3])
-                logger.info(f'Measured bandwidth: {bandwidth_mbps:.2f} Mbps')
+                logger.info('Measured bandwidth: %.2f Mbps', bandwidth_mbps)
                 return bandwidth_mbps
     except subprocess.CalledProcessError as e:
-        logger.error(f'iperf3 error: {e}')
+        logger.error('iperf3 error: %s', e)
     finally:
         # Stop iperf3 server on the remote machine
-        stop_server_cmd = f'ssh {remote_user}@{remote_ip} ' f"'pkill iperf3'"
+        stop_server_cmd = (
+            f'{ssh_cmd(remote_user, remote_ip)} ' f"'pkill iperf3'"
+        )
         subprocess.run(stop_server_cmd, shell=True)
-        logger.debug(f'Stopped iperf3 server on {remote_ip}')
-    logger.warning(f'Failed to measure bandwidth for {remote_ip}.')
+        logger.debug('Stopped iperf3 server on %s', remote_ip)
+    logger.warning('Failed to measure bandwidth for %s.', remote_ip)
     return None
 
 
 def check_disk_space(
-    logger, remote_user, remote_ip, directory, rosbag_path, retries=3, delay=5
+    logger,
+    remote_user,
+    remote_ip,
+    directory,
+    rosbag_path,
+    file_size,
+    retries=3,
+    delay=5,
 ):
     """Check if there's enough disk space on the remote machine."""
     for attempt in range(retries):
         try:
             # Get available disk space on the remote machine
             disk_usage_cmd = (
-                f'ssh {remote_user}@{remote_ip} '
+                f'{ssh_cmd(remote_user, remote_ip)} '
                 f"\"stat -f --format='%a * %S' {directory} | bc\""
             )
             result = subprocess.run(
@@ -380,41 +468,31 @@ def check_disk_space(
                 check=True,
             )
             available_space = int(result.stdout.strip())
-            logger.debug(f'Available space: {available_space} bytes.')
-
-            # Get the file size of the rosbag on the remote machine
-            file_size_cmd = (
-                f"ssh {remote_user}@{remote_ip} 'stat -c%s {rosbag_path}'"
-            )
-            result = subprocess.run(
-                file_size_cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            file_size = int(result.stdout.strip())
-            logger.debug(f'File size: {file_size} bytes.')
+            logger.debug('Available space: %s bytes.', available_space)
+            logger.debug('File size: %s bytes.', file_size)
 
             # Check if there is enough space
             if file_size <= available_space:
                 return True
             else:
                 logger.warning(
-                    f'Insufficient disk space for {rosbag_path}. '
-                    f'Attempting to free up space.'
+                    'Insufficient disk space for %s. '
+                    'Attempting to free up space.',
+                    rosbag_path,
                 )
                 # If no space, delete the oldest mcap file
                 delete_oldest_mcap(logger, remote_user, remote_ip, directory)
 
         except subprocess.CalledProcessError as e:
             logger.error(
-                f'Attempt {attempt + 1} - '
-                f'Failed to check disk space on remote machine: {e}'
+                'Attempt %s - '
+                'Failed to check disk space on remote machine: %s',
+                attempt + 1,
+                e,
             )
 
         if attempt < retries - 1:
-            logger.info(f'Retrying in {delay} seconds...')
+            logger.info('Retrying in %s seconds...', delay)
             time.sleep(delay)
 
     logger.error('Failed to check disk space after multiple attempts.')
@@ -429,7 +507,7 @@ def delete_oldest_mcap(logger, remote_user, remote_ip, directory):
     )
     try:
         result = subprocess.run(
-            f'ssh {remote_user}@{remote_ip} "{list_cmd}"',
+            f'{ssh_cmd(remote_user, remote_ip)} "{list_cmd}"',
             shell=True,
             capture_output=True,
             text=True,
@@ -439,9 +517,9 @@ def delete_oldest_mcap(logger, remote_user, remote_ip, directory):
         if oldest_file:
             delete_cmd = f'rm {oldest_file}'
             run_ssh_command(logger, remote_user, remote_ip, delete_cmd)
-            logger.info(f'Deleted oldest mcap file: {oldest_file}')
+            logger.info('Deleted oldest mcap file: %s', oldest_file)
     except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to delete oldest mcap file: {e}')
+        logger.error('Failed to delete oldest mcap file: %s', e)
         raise
 
 
@@ -449,7 +527,7 @@ def delete_remote_file(logger, remote_user, remote_ip, file_path):
     """Delete a specific file on the remote machine."""
     command = f'rm {file_path}'
     run_ssh_command(logger, remote_user, remote_ip, command)
-    logger.debug(f'Deleted file: {file_path}')
+    logger.debug('Deleted file: %s', file_path)
 
 
 def find_metadata_file(logger, remote_user, remote_ip, remote_directory):
@@ -457,7 +535,7 @@ def find_metadata_file(logger, remote_user, remote_ip, remote_directory):
     find_cmd = f"find {remote_directory} -name 'metadata.yaml'"
     try:
         result = subprocess.run(
-            f'ssh {remote_user}@{remote_ip} ' f"'{find_cmd}'",
+            f'{ssh_cmd(remote_user, remote_ip)} ' f"'{find_cmd}'",
             shell=True,
             capture_output=True,
             text=True,
@@ -465,13 +543,13 @@ def find_metadata_file(logger, remote_user, remote_ip, remote_directory):
         )
         metadata_files = result.stdout.splitlines()
         if metadata_files:
-            logger.info(f'Found metadata.yaml file at {metadata_files[0]}.')
+            logger.info('Found metadata.yaml file at %s.', metadata_files[0])
             return metadata_files[0]
         else:
             logger.error('metadata.yaml file not found.')
             return None
     except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to find metadata.yaml file: {e}')
+        logger.error('Failed to find metadata.yaml file: %s', e)
         raise
 
 
@@ -493,24 +571,27 @@ def copy_metadata_file(
         '--checksum',
         '--progress',
         '--stats',
+        '-e',
+        RSYNC_SSH,
         f'{remote_user}@{remote_ip}:{metadata_path}',
         os.path.join(cloud_upload_directory, relative_metadata_path),
     ]
     try:
-        logger.info(f'Uploading {relative_metadata_path}.')
+        logger.info('Uploading %s.', relative_metadata_path)
         subprocess.run(rsync_cmd, check=True)
-        logger.debug(f'Copied metadata.yaml to {cloud_upload_directory}.')
+        logger.debug('Copied metadata.yaml to %s.', cloud_upload_directory)
         return True
     except subprocess.CalledProcessError as e:
-        logger.error(f'Failed to copy metadata.yaml: {e}')
+        logger.error('Failed to copy metadata.yaml: %s', e)
         return False
 
 
 def read_metadata(logger, metadata_path):
     """Read the metadata.yaml file and return its contents."""
-    with open(metadata_path) as file:
-        metadata = yaml.safe_load(file)
-    logger.debug(f'Read metadata from {metadata_path}.')
+    # libyaml reads the raw bytes directly, skipping a text decode
+    with open(metadata_path, 'rb') as file:
+        metadata = yaml.load(file, Loader=SafeLoader)
+    logger.debug('Read metadata from %s.', metadata_path)
     return metadata
 
 
@@ -519,9 +600,11 @@ def check_and_create_local_directory(logger, directory_path):
     if not os.path.exists(directory_path):
         try:
             os.makedirs(directory_path)
-            logger.debug(f'Created local directory: {directory_path}')
+            logger.debug('Created local directory: %s', directory_path)
         except OSError as e:
-            logger.error(f'Failed to create directory {directory_path}: {e}')
+            logger.error(
+                'Failed to create directory %s: %s', directory_path, e
+            )
             raise
 
 
@@ -541,7 +624,7 @@ def process_directory(
 ):
     """Process each directory."""
     logger.info('')
-    logger.info(f'Processing: {remote_directory}')
+    logger.info('Processing: %s', remote_directory)
     # Create the remote temporary directory
     create_remote_temp_directory(
         logger, remote_user, remote_ip, remote_directory
@@ -556,8 +639,8 @@ def process_directory(
         )
         if metadata_path is None:
             logger.warning(
-                f'metadata.yaml file not found in {remote_directory}. '
-                f'Skipping.'
+                'metadata.yaml file not found in %s. Skipping.',
+                remote_directory,
             )
         relative_metadata_path = os.path.relpath(
             metadata_path, start=base_remote_directory
@@ -567,6 +650,8 @@ def process_directory(
             cloud_upload_directory, relative_metadata_path
         )
 
+        # find_metadata_file searches recursively, so metadata.yaml may sit
+        # in a directory without rosbags that the pre-pass in main skipped
         check_and_create_local_directory(
             logger, os.path.dirname(local_metadata_path)
         )
@@ -580,8 +665,8 @@ def process_directory(
             base_remote_directory,
         ):
             logger.error(
-                f'Failed to copy metadata.yaml from '
-                f'{remote_directory}. Skipping file.'
+                'Failed to copy metadata.yaml from %s. Skipping file.',
+                remote_directory,
             )
 
         # Read the metadata.yaml file
@@ -591,13 +676,8 @@ def process_directory(
             'relative_file_paths', None
         )
 
-        # Retrieve the list of rosbags contained in the remote subdirectory
-        rosbag_list = files_dict.get(remote_directory)
-        if rosbag_list is None:
-            rosbag_list = get_remote_rosbags_list(
-                logger, remote_user, remote_ip, remote_directory
-            )
-            files_dict[remote_directory] = rosbag_list
+        # Rosbags of the subdirectory, as listed once in main
+        rosbag_list = files_dict[remote_directory]
 
         if len(rosbag_list) != len(expected_bags):
             logger.error(
@@ -632,15 +712,30 @@ def process_directory(
             estimated_time_str = f'{seconds} seconds'
 
         logger.info(
-            f'Found {len(rosbag_list)} files to upload with total size '
-            f'{total_size_bytes / (1024**3):.2f} GB from {remote_directory}.'
+            'Found %s files to upload with total size %.2f GB from %s.',
+            len(rosbag_list),
+            total_size_bytes / (1024**3),
+            remote_directory,
         )
         logger.info(
-            f'Estimated rosbags upload time (including compression) '
-            f'is at least: {estimated_time_str}.'
+            'Estimated rosbags upload time (including compression) '
+            'is at least: %s.',
+            estimated_time_str,
+        )
+
+        # Resolve every local destination once, before the transfers
+        local_directory = os.path.join(
+            cloud_upload_directory,
+            os.path.relpath(remote_directory, start=base_remote_directory),
         )
+        local_rosbag_paths = [
+            os.path.join(local_directory, os.path.basename(rosbag))
+            for rosbag in rosbag_list
+        ]
 
         successfully_uploaded_files = []
+        uploaded_bytes = 0
+        batch_start_time = time.monotonic()
 
         # Use ThreadPoolExecutor for parallel processing
         with ThreadPoolExecutor(
@@ -653,24 +748,39 @@ def process_directory(
                     remote_user,
                     remote_ip,
                     rosbag,
+                    rosbag_size,
+                    local_rosbag_path,
                     remote_directory,
-                    cloud_upload_directory,
                     config['mcap_path'],
                     config['upload_attempts'],
-                    base_remote_directory,
                     current_rosbag_number=i + 1,
                     global_rosbag_counter=global_rosbag_counter + i + 1,
                     total_rosbags=total_rosbags,
                 )
-                for i, rosbag in enumerate(rosbag_list)
+                for i, (rosbag, rosbag_size, local_rosbag_path) in enumerate(
+                    zip(rosbag_list, rosbag_sizes, local_rosbag_paths)
+                )
             ]
 
-            for future in futures:
+            for rosbag_size, future in zip(rosbag_sizes, futures):
                 result = future.result()
                 if result:
                     successfully_uploaded_files.append(result)
+                    uploaded_bytes += rosbag_size
+        batch_duration = time.monotonic() - batch_start_time
         global_rosbag_counter += len(successfully_uploaded_files)
 
+        logger.info(
+            'Uploaded %s/%s rosbags (%.2f GB uncompressed) from %s in %.2f '
+            'seconds, an overall rate of %.2f MB/s including compression.',
+            len(successfully_uploaded_files),
+            total_files,
+            uploaded_bytes / (1024**3),
+            remote_directory,
+            batch_duration,
+            uploaded_bytes / (1024**2) / batch_duration,
+        )
+
         if config['clean_up']:
             # Only delete rosbag files that were successfully uploaded
             for rosbag in successfully_uploaded_files:
@@ -697,16 +807,22 @@ def main(config, debug):
     cloud_upload_directory = config['cloud_upload_directory']
     logger.info('Starting rosbag upload process.')
 
+    # Share a single SSH connection between all remote commands
+    start_ssh_master(logger, remote_user, remote_ip)
+    atexit.register(stop_ssh_master, logger, remote_user, remote_ip)
+
     # Measure bandwidth once at the start
     bandwidth_mbps = measure_bandwidth(logger, remote_ip, remote_user)
     if bandwidth_mbps is None:
         logger.error('Could not measure bandwidth. Exiting.')
         return
-    #  Retrieve all subdirectories containing rosbags in the remotes directory
-    subdirectories = list_remote_directories(
+    # Retrieve all subdirectories containing rosbags in the remote
+    # directory, with every rosbag and its size, in a single SSH call
+    rosbags_dict = list_remote_rosbags(
         logger, remote_user, remote_ip, base_remote_directory
     )
-    logger.info(f'Rosbags subdirectories found: {len(subdirectories)}')
+    subdirectories = list(rosbags_dict)
+    logger.info('Rosbags subdirectories found: %s', len(subdirectories))
     total_rosbags = 0
     total_size_bytes = 0.0
     total_estimated_time = 0.0
@@ -714,18 +830,11 @@ def main(config, debug):
     files_dict = {}
 
     # Compute total estimated time for all subdirectories
-    for subdirectory in subdirectories:
-        # Retrieve the list of rosbags contained in the remote subdirectory
-        rosbag_list = get_remote_rosbags_list(
-            logger, remote_user, remote_ip, subdirectory
-        )
+    for subdirectory, rosbags in rosbags_dict.items():
+        rosbag_list = [rosbag for rosbag, _ in rosbags]
+        rosbag_sizes = [size for _, size in rosbags]
+        logger.info('Found %s rosbags in %s.', len(rosbag_list), subdirectory)
         files_dict[subdirectory] = rosbag_list
-
-        # Get the size of each rosbag
-        rosbag_sizes = [
-            get_remote_file_size(logger, remote_user, remote_ip, rosbag)
-            for rosbag in rosbag_list
-        ]
         file_sizes_dict[subdirectory] = rosbag_sizes
         total_rosbags += len(rosbag_list)
         total_size_bytes += sum(rosbag_sizes)
@@ -748,12 +857,14 @@ def main(config, debug):
         estimated_time_str = f'{seconds} seconds'
 
     logger.info(
-        f'Found {total_rosbags} rosbags (mcap) files to upload '
-        f'with total size {total_size_bytes / (1024**3):.2f} GB.'
+        'Found %s rosbags (mcap) files to upload with total size %.2f GB.',
+        total_rosbags,
+        total_size_bytes / (1024**3),
     )
     logger.info(
-        f'Estimated total time (including compression) for '
-        f'all subdirectories is: {estimated_time_str}.'
+        'Estimated total time (including compression) for '
+        'all subdirectories is: %s.',
+        estimated_time_str,
     )
     confirm = input('Do you want to proceed to upload? (yes/no): ')
 
@@ -763,6 +874,16 @@ def main(config, debug):
 
     logger.info('User confirmed upload. Beginning processing of directories.')
 
+    # Create every local destination directory once, before any transfer
+    for subdirectory in subdirectories:
+        check_and_create_local_directory(
+            logger,
+            os.path.join(
+                cloud_upload_directory,
+                os.path.relpath(subdirectory, start=base_remote_directory),
+            ),
+        )
+
     total_uploaded_files = (
         0  # Initialize counter for successfully uploaded files
     )
@@ -798,8 +919,9 @@ def main(config, debug):
 
     # Final log statement after processing all subdirectories
     logger.info(
-        f'Uploading finished. {total_uploaded_files}/{total_files} '
-        f'files were successfully uploaded.'
+        'Uploading finished. %s/%s files were successfully uploaded.',
+        total_uploaded_files,
+        total_files,
     )
 
 
@@ -822,6 +944,6 @@ if __name__ == '__main__':
     args = parser.parse_args()
 
     with open(args.config) as file:
-        config = yaml.safe_load(file)
+        config = yaml.load(file, Loader=SafeLoader)
 
     main(config, args.debug)